@@ -23,6 +23,11 @@ UNAVAILABLE_TIMEOUT = 180  # Number of seconds we wait for a beacon to be seen b
 # and look for unavailable groups that use a random MAC address
 UPDATE_INTERVAL = timedelta(seconds=60)
 
+# RSSI changes smaller than this are only sent by the periodic
+# update once the last update is at least STALE_RSSI_INTERVALS old
+MIN_RSSI_CHANGE = 3
+STALE_RSSI_INTERVALS = 5
+
 # If a device broadcasts this many unique ids from the same address
 # we will add it to the ignore list since its garbage data.
 MAX_IDS = 10
@@ -1,7 +1,10 @@
 """Tracking for iBeacon devices."""
 from __future__ import annotations
 
+import bisect
+from collections import defaultdict
 from datetime import datetime
+import heapq
 import time
 
 from ibeacon_ble import (
@@ -9,7 +12,6 @@ from ibeacon_ble import (
     IBEACON_FIRST_BYTE,
     IBEACON_SECOND_BYTE,
     iBeaconAdvertisement,
-    is_ibeacon_service_info,
     parse,
 )
 
@@ -17,8 +19,8 @@ from homeassistant.components import bluetooth
 from homeassistant.components.bluetooth.match import BluetoothCallbackMatcher
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
-from homeassistant.helpers.device_registry import DeviceRegistry
-from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.device_registry import DeviceEntry, DeviceRegistry
+from homeassistant.helpers.dispatcher import DATA_DISPATCHER, async_dispatcher_send
 from homeassistant.helpers.event import async_track_time_interval
 
 from .const import (
@@ -27,15 +29,22 @@ from .const import (
     DEFAULT_MIN_RSSI,
     DOMAIN,
     MAX_IDS,
+    MIN_RSSI_CHANGE,
     SIGNAL_IBEACON_DEVICE_NEW,
     SIGNAL_IBEACON_DEVICE_SEEN,
     SIGNAL_IBEACON_DEVICE_UNAVAILABLE,
+    STALE_RSSI_INTERVALS,
     UNAVAILABLE_TIMEOUT,
     UPDATE_INTERVAL,
 )
 
 MONOTONIC_TIME = time.monotonic
 
+STALE_RSSI_SECONDS = UPDATE_INTERVAL.total_seconds() * STALE_RSSI_INTERVALS
+
+IBEACON_PREFIX = bytes((IBEACON_FIRST_BYTE, IBEACON_SECOND_BYTE))
+IBEACON_MIN_LENGTH = 23
+
 
 def signal_unavailable(unique_id: str) -> str:
     """Signal for the unique_id going unavailable."""
@@ -49,8 +58,11 @@ def signal_seen(unique_id: str) -> str:
 
 def make_short_address(address: str) -> str:
     """Convert a Bluetooth address to a short address."""
-    results = address.replace("-", ":").split(":")
-    return f"{results[-2].upper()}{results[-1].upper()}"[-4:]
+    if address[-3] in ":-":
+        # AA:BB:CC:DD:EE:FF or AA-BB-CC-DD-EE-FF
+        return (address[-5:-3] + address[-2:]).upper()
+    # CoreBluetooth UUID, the last group is 12 characters
+    return address[-4:].upper()
 
 
 @callback
@@ -78,6 +90,7 @@ def async_name(
 def _async_dispatch_update(
     hass: HomeAssistant,
     device_id: str,
+    seen_signal: str,
     service_info: bluetooth.BluetoothServiceInfoBleak,
     parsed: iBeaconAdvertisement,
     new: bool,
@@ -96,14 +109,71 @@ def _async_dispatch_update(
 
     async_dispatcher_send(
         hass,
-        signal_seen(device_id),
+        seen_signal,
         parsed,
     )
 
 
+def _build_restore_plan(
+    devices: list[DeviceEntry],
+) -> tuple[list[tuple[str, str, str]], set[str]]:
+    """Find the iBeacons to restore from the device registry.
+
+    Returns the (address, group_id, unique_id) of the iBeacons
+    with a fixed MAC address and the group_ids of the iBeacons
+    with a random MAC address.
+    """
+    unique_addresses: list[tuple[str, str, str]] = []
+    random_macs: set[str] = set()
+    for device in devices:
+        unique_id = next(
+            (
+                identifier[1]
+                for identifier in device.identifiers
+                if identifier[0] == DOMAIN
+            ),
+            None,
+        )
+        if not unique_id:
+            continue
+        parts = unique_id.split("_")
+        # iBeacons with a fixed MAC address
+        if len(parts) == 4:
+            address = parts[3]
+            group_id = unique_id[: -len(address) - 1]
+            unique_addresses.append((address, group_id, unique_id))
+        # iBeacons with a random MAC address
+        elif len(parts) == 3:
+            random_macs.add(unique_id)
+    return unique_addresses, random_macs
+
+
 class IBeaconCoordinator:
     """Set up the iBeacon Coordinator."""
 
+    __slots__ = (
+        "hass",
+        "_entry",
+        "_min_rssi",
+        "_dev_reg",
+        "_seen_signal",
+        "_unavail_signal",
+        "_ignore_addresses",
+        "_ignore_addresses_sorted",
+        "_last_rssi_by_unique_id",
+        "_group_ids_by_address",
+        "_unique_ids_by_address",
+        "_unavail_signals_by_address",
+        "_unique_ids_by_group_id",
+        "_addresses_by_group_id",
+        "_unavailable_trackers",
+        "_group_ids_random_macs",
+        "_group_state",
+        "_expiry_heap",
+        # Update listeners are held as weak methods
+        "__weakref__",
+    )
+
     def __init__(
         self, hass: HomeAssistant, entry: ConfigEntry, registry: DeviceRegistry
     ) -> None:
@@ -113,24 +183,38 @@ class IBeaconCoordinator:
         self._min_rssi = entry.options.get(CONF_MIN_RSSI) or DEFAULT_MIN_RSSI
         self._dev_reg = registry
 
+        # Dispatcher signals by unique_id or group_id
+        self._seen_signal: dict[str, str] = {}
+        self._unavail_signal: dict[str, str] = {}
+
         # iBeacon devices that do not follow the spec
         # and broadcast custom data in the major and minor fields
-        self._ignore_addresses: set[str] = set(
+        self._ignore_addresses: frozenset[str] = frozenset(
             entry.data.get(CONF_IGNORE_ADDRESSES, [])
         )
+        self._ignore_addresses_sorted: list[str] = sorted(self._ignore_addresses)
 
         # iBeacons with fixed MAC addresses
-        self._last_rssi_by_unique_id: dict[str, int] = {}
-        self._group_ids_by_address: dict[str, set[str]] = {}
-        self._unique_ids_by_address: dict[str, set[str]] = {}
-        self._unique_ids_by_group_id: dict[str, set[str]] = {}
-        self._addresses_by_group_id: dict[str, set[str]] = {}
+        # unique_id -> (address, last rssi sent, when it was sent)
+        self._last_rssi_by_unique_id: dict[str, tuple[str, int, float]] = {}
+        self._group_ids_by_address: defaultdict[str, set[str]] = defaultdict(set)
+        self._unique_ids_by_address: defaultdict[str, set[str]] = defaultdict(set)
+        self._unavail_signals_by_address: defaultdict[str, list[str]] = defaultdict(
+            list
+        )
+        self._unique_ids_by_group_id: defaultdict[str, set[str]] = defaultdict(set)
+        self._addresses_by_group_id: defaultdict[str, set[str]] = defaultdict(set)
         self._unavailable_trackers: dict[str, CALLBACK_TYPE] = {}
 
         # iBeacon with random MAC addresses
         self._group_ids_random_macs: set[str] = set()
-        self._last_seen_by_group_id: dict[str, bluetooth.BluetoothServiceInfoBleak] = {}
-        self._unavailable_group_ids: set[str] = set()
+        # Last service info seen and if the group is unavailable
+        self._group_state: dict[
+            str, tuple[bluetooth.BluetoothServiceInfoBleak, bool]
+        ] = {}
+        # (last seen, group_id) for each available group, the last seen
+        # time is refreshed lazily when the entry reaches the top of the heap
+        self._expiry_heap: list[tuple[float, str]] = []
 
     @callback
     def _async_handle_unavailable(
@@ -139,8 +223,8 @@ class IBeaconCoordinator:
         """Handle unavailable devices."""
         address = service_info.address
         self._async_cancel_unavailable_tracker(address)
-        for unique_id in self._unique_ids_by_address[address]:
-            async_dispatcher_send(self.hass, signal_unavailable(unique_id))
+        for signal in self._unavail_signals_by_address.get(address, ()):
+            async_dispatcher_send(self.hass, signal)
 
     @callback
     def _async_cancel_unavailable_tracker(self, address: str) -> None:
@@ -150,16 +234,19 @@ class IBeaconCoordinator:
     @callback
     def _async_ignore_address(self, address: str) -> None:
         """Ignore an address that does not follow the spec and any entities created by it."""
-        self._ignore_addresses.add(address)
+        self._ignore_addresses = self._ignore_addresses | {address}
+        bisect.insort(self._ignore_addresses_sorted, address)
         self._async_cancel_unavailable_tracker(address)
+        # Pass a copy as the entry is only saved when its data changes
         self.hass.config_entries.async_update_entry(
             self._entry,
             data=self._entry.data
-            | {CONF_IGNORE_ADDRESSES: sorted(self._ignore_addresses)},
+            | {CONF_IGNORE_ADDRESSES: self._ignore_addresses_sorted.copy()},
         )
         self._async_purge_untrackable_entities(self._unique_ids_by_address[address])
         self._group_ids_by_address.pop(address)
         self._unique_ids_by_address.pop(address)
+        self._unavail_signals_by_address.pop(address)
 
     @callback
     def _async_purge_untrackable_entities(self, unique_ids: set[str]) -> None:
@@ -167,7 +254,11 @@ class IBeaconCoordinator:
         for unique_id in unique_ids:
             if device := self._dev_reg.async_get_device({(DOMAIN, unique_id)}):
                 self._dev_reg.async_remove_device(device.id)
-            self._last_rssi_by_unique_id.pop(unique_id, None)
+        for unique_id in unique_ids & self._last_rssi_by_unique_id.keys():
+            del self._last_rssi_by_unique_id[unique_id]
+        for unique_id in unique_ids & self._seen_signal.keys():
+            del self._seen_signal[unique_id]
+            del self._unavail_signal[unique_id]
 
     @callback
     def _async_convert_random_mac_tracking(
@@ -183,15 +274,28 @@ class IBeaconCoordinator:
         self._addresses_by_group_id.pop(group_id)
         self._async_update_ibeacon_with_random_mac(group_id, service_info, parsed)
 
+    @callback
+    def _async_add_signals(self, device_id: str) -> None:
+        """Build the dispatcher signals for a device."""
+        self._seen_signal[device_id] = signal_seen(device_id)
+        self._unavail_signal[device_id] = signal_unavailable(device_id)
+
     def _async_track_ibeacon_with_unique_address(
         self, address: str, group_id: str, unique_id: str
     ) -> None:
         """Track an iBeacon with a unique address."""
-        self._unique_ids_by_address.setdefault(address, set()).add(unique_id)
-        self._group_ids_by_address.setdefault(address, set()).add(group_id)
+        unique_ids = self._unique_ids_by_address[address]
+        if unique_id in unique_ids:
+            return
+        unique_ids.add(unique_id)
+        self._async_add_signals(unique_id)
+        self._unavail_signals_by_address[address].append(
+            self._unavail_signal[unique_id]
+        )
+        self._group_ids_by_address[address].add(group_id)
 
-        self._unique_ids_by_group_id.setdefault(group_id, set()).add(unique_id)
-        self._addresses_by_group_id.setdefault(group_id, set()).add(address)
+        self._unique_ids_by_group_id[group_id].add(unique_id)
+        self._addresses_by_group_id[group_id].add(address)
 
     @callback
     def _async_update_ibeacon(
@@ -204,6 +308,15 @@ class IBeaconCoordinator:
             return
         if service_info.rssi < self._min_rssi:
             return
+        # Apple uses the same manufacturer id for many
+        # other advertisements that are not iBeacons
+        mfr_data = service_info.manufacturer_data.get(APPLE_MFR_ID)
+        if (
+            mfr_data is None
+            or len(mfr_data) < IBEACON_MIN_LENGTH
+            or not mfr_data.startswith(IBEACON_PREFIX)
+        ):
+            return
         if not (parsed := parse(service_info)):
             return
         group_id = f"{parsed.uuid}_{parsed.major}_{parsed.minor}"
@@ -222,10 +335,22 @@ class IBeaconCoordinator:
         parsed: iBeaconAdvertisement,
     ) -> None:
         """Update iBeacons with random mac addresses."""
-        new = group_id not in self._last_seen_by_group_id
-        self._last_seen_by_group_id[group_id] = service_info
-        self._unavailable_group_ids.discard(group_id)
-        _async_dispatch_update(self.hass, group_id, service_info, parsed, new, False)
+        previous = self._group_state.get(group_id)
+        self._group_state[group_id] = (service_info, False)
+        if new := previous is None:
+            self._async_add_signals(group_id)
+        # New groups and groups coming back from unavailable are not in the heap
+        if previous is None or previous[1]:
+            heapq.heappush(self._expiry_heap, (service_info.time, group_id))
+        _async_dispatch_update(
+            self.hass,
+            group_id,
+            self._seen_signal[group_id],
+            service_info,
+            parsed,
+            new,
+            False,
+        )
 
     @callback
     def _async_update_ibeacon_with_unique_address(
@@ -240,7 +365,11 @@ class IBeaconCoordinator:
         address = service_info.address
         unique_id = f"{group_id}_{address}"
         new = unique_id not in self._last_rssi_by_unique_id
-        self._last_rssi_by_unique_id[unique_id] = service_info.rssi
+        self._last_rssi_by_unique_id[unique_id] = (
+            address,
+            service_info.rssi,
+            service_info.time,
+        )
         self._async_track_ibeacon_with_unique_address(address, group_id, unique_id)
         if address not in self._unavailable_trackers:
             self._unavailable_trackers[address] = bluetooth.async_track_unavailable(
@@ -263,7 +392,15 @@ class IBeaconCoordinator:
             self._async_convert_random_mac_tracking(group_id, service_info, parsed)
             return
 
-        _async_dispatch_update(self.hass, unique_id, service_info, parsed, new, True)
+        _async_dispatch_update(
+            self.hass,
+            unique_id,
+            self._seen_signal[unique_id],
+            service_info,
+            parsed,
+            new,
+            True,
+        )
 
     @callback
     def _async_stop(self) -> None:
@@ -279,17 +416,18 @@ class IBeaconCoordinator:
     @callback
     def _async_check_unavailable_groups_with_random_macs(self) -> None:
         """Check for random mac groups that have not been seen in a while and mark them as unavailable."""
-        now = MONOTONIC_TIME()
-        gone_unavailable = [
-            group_id
-            for group_id in self._group_ids_random_macs
-            if group_id not in self._unavailable_group_ids
-            and (service_info := self._last_seen_by_group_id.get(group_id))
-            and now - service_info.time > UNAVAILABLE_TIMEOUT
-        ]
-        for group_id in gone_unavailable:
-            self._unavailable_group_ids.add(group_id)
-            async_dispatcher_send(self.hass, signal_unavailable(group_id))
+        cutoff = MONOTONIC_TIME() - UNAVAILABLE_TIMEOUT
+        expiry_heap = self._expiry_heap
+        while expiry_heap and expiry_heap[0][0] < cutoff:
+            group_id = expiry_heap[0][1]
+            service_info = self._group_state[group_id][0]
+            if (last_seen := service_info.time) >= cutoff:
+                # Seen again since the entry was pushed
+                heapq.heapreplace(expiry_heap, (last_seen, group_id))
+                continue
+            heapq.heappop(expiry_heap)
+            self._group_state[group_id] = (service_info, True)
+            async_dispatcher_send(self.hass, self._unavail_signal[group_id])
 
     @callback
     def _async_update_rssi(self) -> None:
@@ -298,21 +436,35 @@ class IBeaconCoordinator:
         We don't callback on RSSI changes so we need to check them
         here and send them over the dispatcher periodically to
         ensure the distance calculation is update.
+
+        The parsed advertisement carries the rssi and distance so it
+        has to be parsed again, but the rssi that was sent is recorded
+        so the same service info is not parsed again on the next update.
+
+        Small changes are only sent once the last update is stale.
         """
-        for unique_id, rssi in self._last_rssi_by_unique_id.items():
-            address = unique_id.split("_")[-1]
+        now = MONOTONIC_TIME()
+        dispatchers = self.hass.data.get(DATA_DISPATCHER, {})
+        last_rssi_by_unique_id = self._last_rssi_by_unique_id
+        for unique_id, (address, rssi, sent) in last_rssi_by_unique_id.items():
             if (
-                (
+                dispatchers.get(seen_signal := self._seen_signal[unique_id])
+                and (
                     service_info := bluetooth.async_last_service_info(
                         self.hass, address, connectable=False
                     )
                 )
                 and service_info.rssi != rssi
+                and (
+                    abs(service_info.rssi - rssi) >= MIN_RSSI_CHANGE
+                    or now - sent >= STALE_RSSI_SECONDS
+                )
                 and (parsed := parse(service_info))
             ):
+                last_rssi_by_unique_id[unique_id] = (address, service_info.rssi, now)
                 async_dispatcher_send(
                     self.hass,
-                    signal_seen(unique_id),
+                    seen_signal,
                     parsed,
                 )
 
@@ -323,33 +475,21 @@ class IBeaconCoordinator:
         self._async_update_rssi()
 
     @callback
-    def _async_restore_from_registry(self) -> None:
-        """Restore the state of the Coordinator from the device registry."""
-        for device in self._dev_reg.devices.values():
-            unique_id = None
-            for identifier in device.identifiers:
-                if identifier[0] == DOMAIN:
-                    unique_id = identifier[1]
-                    break
-            if not unique_id:
-                continue
-            # iBeacons with a fixed MAC address
-            if unique_id.count("_") == 3:
-                uuid, major, minor, address = unique_id.split("_")
-                group_id = f"{uuid}_{major}_{minor}"
-                self._async_track_ibeacon_with_unique_address(
-                    address, group_id, unique_id
-                )
-            # iBeacons with a random MAC address
-            elif unique_id.count("_") == 2:
-                uuid, major, minor = unique_id.split("_")
-                group_id = f"{uuid}_{major}_{minor}"
-                self._group_ids_random_macs.add(group_id)
+    def _async_apply_restore_plan(
+        self, unique_addresses: list[tuple[str, str, str]], random_macs: set[str]
+    ) -> None:
+        """Restore the state of the Coordinator from a restore plan."""
+        for address, group_id, unique_id in unique_addresses:
+            self._async_track_ibeacon_with_unique_address(address, group_id, unique_id)
+        self._group_ids_random_macs |= random_macs
 
-    @callback
-    def async_start(self) -> None:
+    async def async_start(self) -> None:
         """Start the Coordinator."""
-        self._async_restore_from_registry()
+        self._async_apply_restore_plan(
+            *await self.hass.async_add_executor_job(
+                _build_restore_plan, list(self._dev_reg.devices.values())
+            )
+        )
         entry = self._entry
         entry.async_on_unload(entry.add_update_listener(self._entry_updated))
         entry.async_on_unload(
@@ -369,10 +509,9 @@ class IBeaconCoordinator:
         for service_info in bluetooth.async_discovered_service_info(
             self.hass, connectable=False
         ):
-            if is_ibeacon_service_info(service_info):
-                self._async_update_ibeacon(
-                    service_info, bluetooth.BluetoothChange.ADVERTISEMENT
-                )
+            self._async_update_ibeacon(
+                service_info, bluetooth.BluetoothChange.ADVERTISEMENT
+            )
         entry.async_on_unload(
             async_track_time_interval(self.hass, self._async_update, UPDATE_INTERVAL)
         )
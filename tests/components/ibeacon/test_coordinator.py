@@ -2,15 +2,24 @@
 
 
 from dataclasses import replace
+from unittest.mock import patch
 
 import pytest
 
-from homeassistant.components.ibeacon.const import CONF_MIN_RSSI, DOMAIN
+from homeassistant.components.ibeacon import coordinator
+from homeassistant.components.ibeacon.const import (
+    CONF_MIN_RSSI,
+    DOMAIN,
+    UPDATE_INTERVAL,
+)
+from homeassistant.components.ibeacon.coordinator import make_short_address
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.service_info.bluetooth import BluetoothServiceInfo
+from homeassistant.util import dt as dt_util
 
 from . import BLUECHARM_BEACON_SERVICE_INFO
 
-from tests.common import MockConfigEntry
+from tests.common import MockConfigEntry, async_fire_time_changed
 from tests.components.bluetooth import inject_bluetooth_service_info
 
 
@@ -106,3 +115,51 @@ async def test_ignore_not_ibeacons(hass):
     )
     await hass.async_block_till_done()
     assert len(hass.states.async_entity_ids()) == before_entity_count
+
+
+@pytest.mark.parametrize(
+    "address,short_address",
+    [
+        ("aa:bb:cc:dd:ee:ff", "EEFF"),
+        ("AA-BB-CC-DD-EE-FF", "EEFF"),
+        ("61DE521B-F0BF-9F44-64D4-75BBE1738105", "8105"),
+    ],
+)
+def test_make_short_address(address, short_address):
+    """Test short addresses are built from the end of the address."""
+    assert make_short_address(address) == short_address
+
+
+async def test_rssi_not_parsed_without_listeners(hass):
+    """Test rssi changes are not parsed once the entities are removed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    inject_bluetooth_service_info(hass, BLUECHARM_BEACON_SERVICE_INFO)
+    await hass.async_block_till_done()
+
+    with patch(
+        "homeassistant.components.bluetooth.async_last_service_info",
+        return_value=replace(BLUECHARM_BEACON_SERVICE_INFO, rssi=-80),
+    ), patch.object(coordinator, "parse", wraps=coordinator.parse) as mock_parse:
+        async_fire_time_changed(hass, dt_util.utcnow() + UPDATE_INTERVAL)
+        await hass.async_block_till_done()
+    assert mock_parse.call_count == 1
+
+    ent_reg = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(ent_reg, entry.entry_id):
+        ent_reg.async_remove(entity.entity_id)
+    await hass.async_block_till_done()
+
+    with patch(
+        "homeassistant.components.bluetooth.async_last_service_info",
+        return_value=replace(BLUECHARM_BEACON_SERVICE_INFO, rssi=-50),
+    ), patch.object(coordinator, "parse", wraps=coordinator.parse) as mock_parse:
+        async_fire_time_changed(hass, dt_util.utcnow() + UPDATE_INTERVAL * 2)
+        await hass.async_block_till_done()
+    assert mock_parse.call_count == 0
@@ -6,10 +6,16 @@ from datetime import timedelta
 import time
 from unittest.mock import patch
 
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
 import pytest
 
 from homeassistant.components.bluetooth.const import UNAVAILABLE_TRACK_SECONDS
-from homeassistant.components.ibeacon.const import DOMAIN, UNAVAILABLE_TIMEOUT
+from homeassistant.components.ibeacon.const import (
+    DOMAIN,
+    UNAVAILABLE_TIMEOUT,
+    UPDATE_INTERVAL,
+)
 from homeassistant.const import (
     ATTR_FRIENDLY_NAME,
     STATE_HOME,
@@ -26,6 +32,7 @@ from . import (
 
 from tests.common import MockConfigEntry, async_fire_time_changed
 from tests.components.bluetooth import (
+    inject_advertisement_with_time_and_source,
     inject_bluetooth_service_info,
     patch_all_discovered_devices,
 )
@@ -130,3 +137,69 @@ async def test_device_tracker_random_address(hass):
     tracker_attributes = tracker.attributes
     assert tracker.state == STATE_HOME
     assert tracker_attributes[ATTR_FRIENDLY_NAME] == "RandomAddress_1234"
+
+
+def _inject_random_address_at(hass, address, seen_time):
+    """Inject the random address beacon from an address at a monotonic time."""
+    info = BEACON_RANDOM_ADDRESS_SERVICE_INFO
+    inject_advertisement_with_time_and_source(
+        hass,
+        BLEDevice(address=address, name=info.name, details={}, rssi=info.rssi),
+        AdvertisementData(
+            local_name=info.name,
+            manufacturer_data=info.manufacturer_data,
+            service_data=info.service_data,
+            service_uuids=info.service_uuids,
+        ),
+        seen_time,
+        info.source,
+    )
+
+
+async def test_device_tracker_random_address_seen_again(hass):
+    """Test random address groups seen again stay home and can expire again."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+    )
+    entry.add_to_hass(hass)
+    start_time = time.monotonic()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    for i in range(20):
+        _inject_random_address_at(hass, f"AA:BB:CC:DD:EE:{i:02X}", start_time)
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_HOME
+
+    async def _async_check(now: float, intervals: int) -> None:
+        with patch_all_discovered_devices([]), patch(
+            "homeassistant.components.ibeacon.coordinator.MONOTONIC_TIME",
+            return_value=now,
+        ):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + UPDATE_INTERVAL * intervals
+            )
+            await hass.async_block_till_done()
+
+    # Seen again before the first advertisement expired
+    _inject_random_address_at(hass, "AA:BB:CC:DD:EE:DD", start_time + 100)
+    await hass.async_block_till_done()
+    await _async_check(start_time + UNAVAILABLE_TIMEOUT + 1, 1)
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_HOME
+
+    await _async_check(start_time + 100 + UNAVAILABLE_TIMEOUT + 1, 2)
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_NOT_HOME
+
+    # Comes back and expires again
+    _inject_random_address_at(hass, "AA:BB:CC:DD:EE:EE", start_time + 400)
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_HOME
+
+    await _async_check(start_time + 400 + UNAVAILABLE_TIMEOUT - 1, 3)
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_HOME
+
+    await _async_check(start_time + 400 + UNAVAILABLE_TIMEOUT + 1, 4)
+    assert hass.states.get("device_tracker.randomaddress_1234").state == STATE_NOT_HOME
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -3,17 +3,27 @@
 
 from dataclasses import replace
 from datetime import timedelta
+import time
+from unittest.mock import patch
 
+from ibeacon_ble import iBeaconAdvertisement, parse
 import pytest
 
 from homeassistant.components.bluetooth.const import UNAVAILABLE_TRACK_SECONDS
-from homeassistant.components.ibeacon.const import DOMAIN, UPDATE_INTERVAL
+from homeassistant.components.ibeacon.const import (
+    DOMAIN,
+    STALE_RSSI_INTERVALS,
+    UPDATE_INTERVAL,
+)
+from homeassistant.components.ibeacon.coordinator import signal_seen
 from homeassistant.components.sensor import ATTR_STATE_CLASS
 from homeassistant.const import (
     ATTR_FRIENDLY_NAME,
     ATTR_UNIT_OF_MEASUREMENT,
     STATE_UNAVAILABLE,
 )
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.util import dt as dt_util
 
 from . import (
@@ -182,3 +192,62 @@ async def test_can_unload_and_reload(hass):
     assert (
         hass.states.get("sensor.bluecharm_177999_8105_estimated_distance").state == "2"
     )
+
+
+async def test_small_rssi_changes_are_throttled(hass):
+    """Test small rssi changes are only sent by the periodic update when stale."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    start_time = time.monotonic()
+    inject_bluetooth_service_info(hass, BLUECHARM_BEACON_SERVICE_INFO)
+    await hass.async_block_till_done()
+
+    parsed = parse(BLUECHARM_BEACON_SERVICE_INFO)
+    unique_id = (
+        f"{parsed.uuid}_{parsed.major}_{parsed.minor}"
+        f"_{BLUECHARM_BEACON_SERVICE_INFO.address}"
+    )
+    sent: list[int] = []
+
+    @callback
+    def _async_seen(parsed: iBeaconAdvertisement) -> None:
+        sent.append(parsed.rssi)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, signal_seen(unique_id), _async_seen)
+    )
+
+    async def _async_update(intervals: int, rssi: int) -> None:
+        with patch(
+            "homeassistant.components.bluetooth.async_last_service_info",
+            return_value=replace(BLUECHARM_BEACON_SERVICE_INFO, rssi=rssi),
+        ), patch(
+            "homeassistant.components.ibeacon.coordinator.MONOTONIC_TIME",
+            return_value=start_time + UPDATE_INTERVAL.total_seconds() * intervals,
+        ):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + UPDATE_INTERVAL * intervals
+            )
+            await hass.async_block_till_done()
+
+    await _async_update(1, -64)
+    assert not sent
+
+    await _async_update(2, -66)
+    assert sent == [-66]
+
+    await _async_update(3, -65)
+    assert sent == [-66]
+
+    # Still inside the window one interval before it goes stale
+    await _async_update(1 + STALE_RSSI_INTERVALS, -65)
+    assert sent == [-66]
+
+    await _async_update(3 + STALE_RSSI_INTERVALS, -65)
+    assert sent == [-66, -65]